@@ -1,22 +1,39 @@
 import os
+import re
+import random
 import logging
 import asyncio
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Set, Optional, Tuple
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache, partial, wraps
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Set, Optional, Tuple
 
 import httpx
+from aiolimiter import AsyncLimiter
 from telegram import (
     Update,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
 )
 from telegram.ext import (
+    AIORateLimiter,
     ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
     ContextTypes,
 )
+from telegram.error import BadRequest
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # no orjson wheel for this platform – stdlib also takes bytes
+    import json
+    _json_loads = json.loads
 
 # ======================================================
 # Logging
@@ -43,17 +60,60 @@ SKIDDLE_API_KEY = os.environ.get("SKIDDLE_API_KEY")
 # Optional: admin chat ID for startup notification (string)
 ADMIN_CHAT_ID = os.environ.get("ADMIN_CHAT_ID")
 
+# Optional: SQLite file that persists known users across restarts
+STATE_DB_PATH = os.environ.get("STATE_DB_PATH")
+
+# Optional: receive updates via webhook instead of polling (production)
+USE_WEBHOOK = os.environ.get("USE_WEBHOOK", "").strip().lower() in ("1", "true", "yes")
+PUBLIC_URL = os.environ.get("PUBLIC_URL") or os.environ.get("RENDER_EXTERNAL_URL")
+PORT = int(os.environ.get("PORT", "8443"))
+TG_WEBHOOK_SECRET = os.environ.get("TG_WEBHOOK_SECRET")
+
 # ======================================================
 # In-memory state
 # ======================================================
 
 KNOWN_USERS: Set[int] = set()          # chat IDs that did /start
-ALERTED_EVENT_IDS: Set[str] = set()    # event IDs we already alerted on (per process)
+# event ID -> time.monotonic() when alerted; insertion order == alert order
+ALERTED_EVENT_IDS: Dict[str, float] = {}
 LAST_SCAN_TIME: Optional[datetime] = None
 LAST_SCAN_COUNT: int = 0
+# Providers queried by the most recent scan -> True if that provider was
+# down (every request failed with an error a retry could fix)
+LAST_SCAN_PROVIDERS_DOWN: Dict[str, bool] = {}
 
 RADAR_LOOP_STARTED: bool = False
 
+# Last rendered HUD dashboard, reused while the state it shows is unchanged
+_LAST_HUD_STATE: Optional[Tuple] = None
+_LAST_HUD_TEXT: str = ""
+
+# Latest ranked scan, shared by /scan and the HUD so bursts of taps reuse it
+_LAST_OPPS: List["Opportunity"] = []
+_LAST_OPPS_AT: Optional[float] = None  # time.monotonic() of that scan
+_SCAN_LOCK: Optional[asyncio.Lock] = None
+
+# (chat_id, callback data) -> time.monotonic() of the last accepted press
+_LAST_CALLBACK_AT: Dict[Tuple[int, str], float] = {}
+
+# Set to cut the radar loop's sleep short (created by radar_auto_loop)
+_RADAR_WAKE: Optional[asyncio.Event] = None
+
+# Rendered alerts waiting to be broadcast (created in on_startup)
+_ALERT_QUEUE: Optional[asyncio.Queue] = None
+
+# Shared HTTP client for all providers (created lazily, closed on shutdown)
+_HTTP: Optional[httpx.AsyncClient] = None
+
+# Caps in-flight Ticketmaster calls (a connection-level bound, not a rate)
+TM_MAX_CONCURRENCY = 4
+# Discovery API allows 5 req/s per key; the limiter keeps request starts under it
+TM_MAX_REQUESTS_PER_SECOND = 5
+# Per-keyword page size; one artist/fighter rarely has more UK dates in the window
+TM_PAGE_SIZE = 50
+_TM_SEMAPHORE: Optional[asyncio.Semaphore] = None
+_TM_LIMITER: Optional[AsyncLimiter] = None
+
 # Provider toggles (can be changed via HUD)
 PROVIDER_CONFIG = {
     "tm_music": True,
@@ -64,6 +124,19 @@ PROVIDER_CONFIG = {
 # Radar config
 MONEY_MAKER_THRESHOLD = 60.0  # trade_score threshold for alerts (slightly aggressive)
 RADAR_INTERVAL_SECONDS = 300  # 5 minutes
+RADAR_INTERVAL_JITTER = 0.10  # ±10% so restarts/instances don't tick in lockstep
+RADAR_INTERVAL_MAX_SECONDS = 30 * 60  # backoff ceiling while providers keep failing
+PROVIDER_CACHE_TTL_SECONDS = 600  # reuse provider API responses for 10 minutes
+PROVIDER_ERROR_TTL_SECONDS = 60   # remember provider failures this long before retrying
+ALERTED_EVENT_TTL_SECONDS = 7 * 24 * 3600  # an event may re-alert after a week
+ALERTED_EVENT_MAX = 10_000    # hard cap on remembered alerted events
+ALERT_SEND_CONCURRENCY = 100  # in-flight alert sends; AIORateLimiter paces the actual rate
+SCAN_RESULT_MAX_AGE_SECONDS = 60  # /scan + HUD reuse a scan this recent
+MAX_ALERTS_PER_SCAN = 5       # new hot events pushed per radar tick
+ALERT_QUEUE_MAX = 10          # pending alert broadcasts before the radar loop waits
+TG_POLL_TIMEOUT_SECONDS = 30  # getUpdates long-poll timeout
+TG_MESSAGE_LIMIT = 3900       # Telegram rejects >4096 chars; split below that
+HUD_CALLBACK_DEBOUNCE_SECONDS = 1.5  # repeat presses of one button inside this are dropped
 
 # Radar focus – internal lists
 TRENDING_ARTISTS = [
@@ -107,12 +180,30 @@ UK_CITIES = [
     "Newcastle",
 ]
 
+# Lowercased views of the lists above, built once for the scorers.
+# Name matching uses one compiled alternation per list, so each event name
+# is scanned once instead of once per artist/fighter.
+UK_CITIES_LC = frozenset(c.lower() for c in UK_CITIES)
+UK_CITIES_RE = re.compile("|".join(re.escape(c) for c in UK_CITIES_LC))
+TRENDING_ARTISTS_RE = re.compile("|".join(re.escape(a.lower()) for a in TRENDING_ARTISTS))
+TRENDING_FIGHTERS_RE = re.compile("|".join(re.escape(f.lower()) for f in TRENDING_FIGHTERS))
+
+# Boxing headline keywords -> tag; add names here rather than in the scorer
+BOXING_TAG_KEYWORDS = {
+    "crossover": ["Jake Paul", "KSI"],
+    "elite": ["Anthony Joshua", "Tyson Fury", "UFC"],
+}
+BOXING_TAG_PATTERNS = [
+    (tag, re.compile("|".join(re.escape(k.lower()) for k in keywords)))
+    for tag, keywords in BOXING_TAG_KEYWORDS.items()
+]
+
 
 # ======================================================
 # Model
 # ======================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Opportunity:
     event_id: str
     name: str
@@ -125,10 +216,12 @@ class Opportunity:
     demand_score: float  # 0-100
     risk_score: float    # 0-100
     url: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[Tuple[str, ...]] = None
+    # Derived scores, computed once here rather than on every sort/filter
+    margin_pct_guess: float = field(init=False)
+    trade_score: float = field(init=False)
 
-    @property
-    def margin_pct_guess(self) -> float:
+    def __post_init__(self) -> None:
         # Simple proxy: cheaper tickets + high demand => higher % margin
         if self.primary_min <= 0:
             base = 12.0  # assume pre-sale / not fully priced yet
@@ -137,47 +230,296 @@ class Opportunity:
 
         cheap_boost = 10.0 if self.primary_min > 0 and self.primary_min <= 80 else 0.0
         demand_boost = (self.demand_score - 50) * 0.4
-        return max(0.0, base + cheap_boost + demand_boost)
+        margin_pct_guess = max(0.0, base + cheap_boost + demand_boost)
+        # Frozen, so derived fields are set through object.__setattr__
+        object.__setattr__(self, "margin_pct_guess", margin_pct_guess)
 
-    @property
-    def trade_score(self) -> float:
         # demand + margin guess – risk
-        return self.demand_score + self.margin_pct_guess - self.risk_score
+        object.__setattr__(
+            self, "trade_score", self.demand_score + margin_pct_guess - self.risk_score
+        )
 
 
 # ======================================================
-# Ticketmaster helpers (Discovery API)
+# HTTP client
 # ======================================================
 
-async def _tm_get_events(params: Dict) -> List[Dict]:
-    """Low-level helper to call Ticketmaster Discovery API."""
-    if not TM_API_KEY:
-        logger.warning("No TM_API_KEY / TICKETMASTER_API_KEY set; skipping Ticketmaster.")
-        return []
+def get_http() -> httpx.AsyncClient:
+    """Return the shared keep-alive client, creating it on first use."""
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _HTTP
+
+
+async def close_http() -> None:
+    global _HTTP
+    if _HTTP is not None:
+        await _HTTP.aclose()
+        _HTTP = None
+
+
+def is_retryable_error(e: BaseException) -> bool:
+    """True for failures a later retry can fix: 429, 5xx, timeouts/connection errors."""
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(e, httpx.TransportError)
+
+
+def async_ttl_cache(ttl: float, error_ttl: float = 0.0) -> Callable:
+    """
+    Cache an async function's results per positional-args tuple for `ttl`
+    seconds. Failures are remembered for `error_ttl` seconds and re-raised
+    without a request, so a 429/5xx isn't hammered by every HUD tap. Any
+    caller in that window gets the cached error – including a radar tick
+    that follows a failed HUD scan, which then counts that recent failure
+    as its own. Concurrent misses
+    on the same key share one in-flight call (e.g. the radar tick and a
+    HUD scan landing together).
+    """
+    def decorator(fn):
+        # args -> (monotonic_ts, result, exception)
+        cache: Dict[Tuple, Tuple[float, object, Optional[BaseException]]] = {}
+        locks: Dict[Tuple, asyncio.Lock] = {}
+
+        def fresh(args: Tuple):
+            hit = cache.get(args)
+            if hit is None:
+                return None
+            age = time.monotonic() - hit[0]
+            if age < (error_ttl if hit[2] is not None else ttl):
+                return hit
+            return None
+
+        def unwrap(hit):
+            if hit[2] is not None:
+                raise hit[2]
+            return hit[1]
+
+        @wraps(fn)
+        async def wrapper(*args):
+            hit = fresh(args)
+            if hit is not None:
+                return unwrap(hit)
+            lock = locks.setdefault(args, asyncio.Lock())
+            async with lock:
+                # Another caller may have filled it while we waited
+                hit = fresh(args)
+                if hit is not None:
+                    return unwrap(hit)
+                try:
+                    result = await fn(*args)
+                except Exception as e:
+                    if error_ttl > 0:
+                        cache[args] = (time.monotonic(), None, e)
+                    raise
+                cache[args] = (time.monotonic(), result, None)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+# ======================================================
+# Persistence (optional, STATE_DB_PATH)
+# ======================================================
+
+def _db_connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(STATE_DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS known_users (user_id INTEGER PRIMARY KEY)")
+    return conn
+
+
+def load_known_users() -> Set[int]:
+    """Read persisted subscriber IDs (empty if persistence is off)."""
+    if not STATE_DB_PATH:
+        return set()
+    with closing(_db_connect()) as conn:
+        return {row[0] for row in conn.execute("SELECT user_id FROM known_users")}
 
-    base_params = {
+
+def save_known_user(user_id: int) -> None:
+    if not STATE_DB_PATH:
+        return
+    with closing(_db_connect()) as conn, conn:
+        conn.execute("INSERT OR IGNORE INTO known_users (user_id) VALUES (?)", (user_id,))
+
+
+# ======================================================
+# Scoring
+# ======================================================
+# Scores are a pure function of (name, city, price), so they are memoized:
+# the same listing seen on the next radar tick is not re-scored.
+
+ScoreResult = Tuple[float, float, Tuple[str, ...]]  # (demand, risk, tags)
+
+
+@lru_cache(maxsize=4096)
+def _score_tm_music(name_lower: str, city_lower: str, primary_min: float) -> ScoreResult:
+    demand_score = 55.0
+
+    # Boost if UK city of interest
+    if city_lower in UK_CITIES_LC:
+        demand_score += 10.0
+
+    # Boost if trending artist / brand mentioned
+    if TRENDING_ARTISTS_RE.search(name_lower):
+        demand_score += 25.0
+
+    # Boost if relatively affordable
+    if primary_min > 0 and primary_min <= 80:
+        demand_score += 10.0
+
+    # Risk – festivals & club shows moderate risk
+    risk_score = 20.0
+
+    tags: List[str] = ["music"]
+    if "festival" in name_lower:
+        tags.append("festival")
+    if primary_min > 0 and primary_min <= 60:
+        tags.append("cheap-entry")
+    if demand_score >= 80:
+        tags.append("hype")
+
+    return demand_score, risk_score, tuple(tags)
+
+
+@lru_cache(maxsize=4096)
+def _score_tm_boxing(name_lower: str, primary_min: float) -> ScoreResult:
+    demand_score = 60.0
+
+    # Heavy boost if it’s clearly a big-name fight
+    if TRENDING_FIGHTERS_RE.search(name_lower):
+        demand_score += 30.0
+
+    # Boxing is higher risk (injury, cancellations, undercards)
+    risk_score = 28.0
+
+    tags: List[str] = ["boxing"]
+    for tag, pattern in BOXING_TAG_PATTERNS:
+        if pattern.search(name_lower):
+            tags.append(tag)
+    if primary_min > 0 and primary_min <= 120:
+        demand_score += 10.0
+        tags.append("affordable-entry")
+
+    return demand_score, risk_score, tuple(tags)
+
+
+@lru_cache(maxsize=4096)
+def _score_skiddle(name_lower: str, town_lower: str, primary_min: float) -> ScoreResult:
+    demand_score = 55.0
+
+    # Boost if in one of our UK target cities
+    if UK_CITIES_RE.search(town_lower):
+        demand_score += 10.0
+
+    # Boost if trending artist/brand appears in eventname
+    if TRENDING_ARTISTS_RE.search(name_lower):
+        demand_score += 25.0
+
+    # Boost for cheap entry (classic rave/flipper territory)
+    if primary_min > 0 and primary_min <= 35:
+        demand_score += 10.0
+
+    # Risk is slightly higher than TM music due to club cancellations, etc.
+    risk_score = 20.0
+
+    tags: List[str] = ["Skiddle"]
+    if "festival" in name_lower:
+        tags.append("festival")
+    if primary_min > 0 and primary_min <= 25:
+        tags.append("cheap-entry")
+    if demand_score >= 80:
+        tags.append("hype")
+
+    return demand_score, risk_score, tuple(tags)
+
+
+# ======================================================
+# Ticketmaster helpers (Discovery API)
+# ======================================================
+
+@async_ttl_cache(PROVIDER_CACHE_TTL_SECONDS, PROVIDER_ERROR_TTL_SECONDS)
+async def _tm_get_events(classification: str, keyword: str, days: int) -> List[Dict]:
+    """Low-level helper to call Ticketmaster Discovery API. Raises on failure."""
+    now = datetime.now(timezone.utc)
+    params = {
         "apikey": TM_API_KEY,
         "countryCode": "GB",   # UK only
-        "size": 100,
+        "size": TM_PAGE_SIZE,
         "sort": "date,asc",
         "locale": "*",
+        "classificationName": classification,
+        "startDateTime": now.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "endDateTime": (now + timedelta(days=days)).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "keyword": keyword,
     }
-    base_params.update(params)
 
     url = "https://app.ticketmaster.com/discovery/v2/events.json"
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=base_params)
-            resp.raise_for_status()
-            data = resp.json()
-    except Exception as e:
-        logger.warning("Ticketmaster request failed: %s", e)
-        return []
-
+    # Only real network calls take a slot / token – cache hits never get here
+    global _TM_SEMAPHORE, _TM_LIMITER
+    if _TM_SEMAPHORE is None:
+        _TM_SEMAPHORE = asyncio.Semaphore(TM_MAX_CONCURRENCY)
+        # Bucket of one: a bucket of 5 would allow a burst of 5 on top of the 5/s drip
+        _TM_LIMITER = AsyncLimiter(1, 1 / TM_MAX_REQUESTS_PER_SECOND)
+    async with _TM_SEMAPHORE, _TM_LIMITER:
+        resp = await get_http().get(url, params=params)
+    resp.raise_for_status()
+    data = _json_loads(resp.content)
     return data.get("_embedded", {}).get("events", [])
 
 
+async def _tm_search(
+    classification: str, keywords: List[str], days: int
+) -> Tuple[List[Dict], bool]:
+    """
+    Run one Discovery query per keyword in parallel and merge the results.
+    TM treats a multi-word keyword as a single phrase, so joining artists
+    into one query matches almost nothing. Failed keywords are logged; the
+    returned flag is True only if every keyword failed with a retryable error.
+    """
+    if not TM_API_KEY:
+        logger.warning("No TM_API_KEY / TICKETMASTER_API_KEY set; skipping Ticketmaster.")
+        return [], False
+
+    # Drop accidental duplicates ("UFC" listed twice, "drake"/"Drake")
+    unique: Dict[str, str] = {}
+    for kw in keywords:
+        unique.setdefault(kw.strip().lower(), kw.strip())
+
+    retryable_failures = 0
+
+    async def one(keyword: str) -> List[Dict]:
+        nonlocal retryable_failures
+        try:
+            return await _tm_get_events(classification, keyword, days)
+        except Exception as e:
+            logger.warning("Ticketmaster request failed (%s): %s", keyword, e)
+            if is_retryable_error(e):
+                retryable_failures += 1
+            return []
+
+    batches = await asyncio.gather(*(one(kw) for kw in unique.values()))
+    down = bool(unique) and retryable_failures == len(unique)
+
+    # Same event can match several keywords – keep the first copy
+    merged: Dict[str, Dict] = {}
+    for batch in batches:
+        for ev in batch:
+            merged.setdefault(ev.get("id") or ev.get("name") or "", ev)
+    return list(merged.values()), down
+
+
 def _parse_price(ev: Dict) -> Tuple[float, float]:
     """Extract min/max price if present."""
     primary_min = 0.0
@@ -198,25 +540,22 @@ def _parse_price(ev: Dict) -> Tuple[float, float]:
 def _parse_basic_event_fields(ev: Dict) -> Dict:
     """Normalize name, city, venue, date."""
     name = ev.get("name") or "Unknown Event"
-    venue = "Unknown venue"
-    city = "Unknown"
-    try:
-        v = (ev.get("_embedded", {}).get("venues") or [])[0]
-        venue = v.get("name") or venue
-        city = (v.get("city") or {}).get("name") or city
-    except Exception:
-        pass
+    venues = (ev.get("_embedded") or {}).get("venues") or [{}]
+    v = venues[0] or {}
+    venue = v.get("name") or "Unknown venue"
+    city = (v.get("city") or {}).get("name") or "Unknown"
 
     start_info = (ev.get("dates") or {}).get("start") or {}
-    dt_raw = start_info.get("dateTime") or start_info.get("localDate")
+    # localDate is plain YYYY-MM-DD in venue time – no timezone handling needed
+    dt_raw = start_info.get("localDate") or start_info.get("dateTime")
     date_str = dt_raw or "Unknown date"
     if dt_raw:
         try:
             if "T" in dt_raw:
-                dt = datetime.fromisoformat(dt_raw.replace("Z", "+00:00"))
+                d = datetime.fromisoformat(dt_raw.replace("Z", "+00:00")).date()
             else:
-                dt = datetime.fromisoformat(dt_raw + "T00:00:00+00:00")
-            date_str = dt.strftime("%d %b %Y")
+                d = date.fromisoformat(dt_raw)
+            date_str = d.strftime("%d %b %Y")
         except Exception:
             pass
 
@@ -228,154 +567,89 @@ def _parse_basic_event_fields(ev: Dict) -> Dict:
     }
 
 
+def _build_opportunities(
+    builder: Callable[[Dict], Opportunity], events: List[Dict]
+) -> List[Opportunity]:
+    """Parse + score a provider page. Runs in a worker thread via asyncio.to_thread."""
+    return [builder(ev) for ev in events]
+
+
+def _tm_music_opportunity(ev: Dict) -> Opportunity:
+    """Build a scored Opportunity from a TM music event."""
+    base = _parse_basic_event_fields(ev)
+    primary_min, primary_max = _parse_price(ev)
+    name_lc = base["name"].lower()
+    city_lc = base["city"].lower()
+    demand_score, risk_score, tags = _score_tm_music(name_lc, city_lc, primary_min)
+
+    return Opportunity(
+        event_id=ev.get("id") or base["name"],
+        name=base["name"],
+        city=base["city"],
+        venue=base["venue"],
+        date_str=base["date_str"],
+        source="TM-Music",
+        primary_min=primary_min,
+        primary_max=primary_max,
+        demand_score=demand_score,
+        risk_score=risk_score,
+        url=ev.get("url"),
+        tags=tags,
+    )
+
+
+def _tm_boxing_opportunity(ev: Dict) -> Opportunity:
+    """Build a scored Opportunity from a TM sports/fight event."""
+    base = _parse_basic_event_fields(ev)
+    primary_min, primary_max = _parse_price(ev)
+    name_lc = base["name"].lower()
+    demand_score, risk_score, tags = _score_tm_boxing(name_lc, primary_min)
+
+    return Opportunity(
+        event_id=ev.get("id") or base["name"],
+        name=base["name"],
+        city=base["city"],
+        venue=base["venue"],
+        date_str=base["date_str"],
+        source="TM-Boxing",
+        primary_min=primary_min,
+        primary_max=primary_max,
+        demand_score=demand_score,
+        risk_score=risk_score,
+        url=ev.get("url"),
+        tags=tags,
+    )
+
+
 # ======================================================
 # Providers: Ticketmaster music + boxing
 # ======================================================
 
-async def fetch_tm_music_hot() -> List[Opportunity]:
+async def fetch_tm_music_hot(down: Dict[str, bool]) -> List[Opportunity]:
     """Fetch hot UK music/festival events likely to be money-makers."""
     if not TM_API_KEY or not PROVIDER_CONFIG.get("tm_music", True):
         return []
 
-    now = datetime.now(timezone.utc)
-    params = {
-        "classificationName": "music",
-        "startDateTime": now.isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "endDateTime": (now + timedelta(days=90)).isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "keyword": " ".join(TRENDING_ARTISTS),
-    }
-
-    events = await _tm_get_events(params)
-    out: List[Opportunity] = []
-
-    for ev in events:
-        base = _parse_basic_event_fields(ev)
-        event_id = ev.get("id") or base["name"]
-
-        primary_min, primary_max = _parse_price(ev)
-
-        # Demand scoring
-        name_lower = base["name"].lower()
-        demand_score = 55.0
-
-        # Boost if UK city of interest
-        if any(c.lower() == base["city"].lower() for c in UK_CITIES):
-            demand_score += 10.0
-
-        # Boost if trending artist / brand mentioned
-        for artist in TRENDING_ARTISTS:
-            if artist.lower() in name_lower:
-                demand_score += 25.0
-                break
-
-        # Boost if relatively affordable
-        if primary_min > 0 and primary_min <= 80:
-            demand_score += 10.0
-
-        # Risk – festivals & club shows moderate risk
-        risk_score = 20.0
-
-        tags: List[str] = ["music"]
-        if "festival" in name_lower:
-            tags.append("festival")
-        if primary_min > 0 and primary_min <= 60:
-            tags.append("cheap-entry")
-        if demand_score >= 80:
-            tags.append("hype")
-
-        opp = Opportunity(
-            event_id=event_id,
-            name=base["name"],
-            city=base["city"],
-            venue=base["venue"],
-            date_str=base["date_str"],
-            source="TM-Music",
-            primary_min=primary_min,
-            primary_max=primary_max,
-            demand_score=demand_score,
-            risk_score=risk_score,
-            url=ev.get("url"),
-            tags=tags,
-        )
-        out.append(opp)
-
-    return out
+    events, down["tm_music"] = await _tm_search("music", TRENDING_ARTISTS, 90)
+    return await asyncio.to_thread(_build_opportunities, _tm_music_opportunity, events)
 
 
-async def fetch_tm_boxing_hot() -> List[Opportunity]:
+async def fetch_tm_boxing_hot(down: Dict[str, bool]) -> List[Opportunity]:
     """Fetch big boxing / fight-night style events (Jake Paul, AJ, etc.)."""
     if not TM_API_KEY or not PROVIDER_CONFIG.get("tm_boxing", True):
         return []
 
-    now = datetime.now(timezone.utc)
-    params = {
-        "classificationName": "sports",
-        "startDateTime": now.isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "endDateTime": (now + timedelta(days=120)).isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "keyword": " ".join(TRENDING_FIGHTERS),
-    }
-
-    events = await _tm_get_events(params)
-    out: List[Opportunity] = []
-
-    for ev in events:
-        base = _parse_basic_event_fields(ev)
-        event_id = ev.get("id") or base["name"]
-
-        primary_min, primary_max = _parse_price(ev)
-        name_lower = base["name"].lower()
-
-        demand_score = 60.0
-
-        # Heavy boost if it’s clearly a big-name fight
-        for fighter in TRENDING_FIGHTERS:
-            if fighter.lower() in name_lower:
-                demand_score += 30.0
-                break
-
-        # Boxing is higher risk (injury, cancellations, undercards)
-        risk_score = 28.0
-
-        tags: List[str] = ["boxing"]
-        if "jake paul" in name_lower or "ksi" in name_lower:
-            tags.append("crossover")
-        if "anthony joshua" in name_lower or "tyson fury" in name_lower or "ufc" in name_lower:
-            tags.append("elite")
-        if primary_min > 0 and primary_min <= 120:
-            demand_score += 10.0
-            tags.append("affordable-entry")
-
-        opp = Opportunity(
-            event_id=event_id,
-            name=base["name"],
-            city=base["city"],
-            venue=base["venue"],
-            date_str=base["date_str"],
-            source="TM-Boxing",
-            primary_min=primary_min,
-            primary_max=primary_max,
-            demand_score=demand_score,
-            risk_score=risk_score,
-            url=ev.get("url"),
-            tags=tags,
-        )
-        out.append(opp)
-
-    return out
+    events, down["tm_boxing"] = await _tm_search("sports", TRENDING_FIGHTERS, 120)
+    return await asyncio.to_thread(_build_opportunities, _tm_boxing_opportunity, events)
 
 
 # ======================================================
 # Provider: Skiddle UK
 # ======================================================
 
-async def fetch_skiddle_hot() -> List[Opportunity]:
-    """
-    Fetch hot UK events from Skiddle API.
-    Focus: raves, club nights, festivals, live music in UK cities.
-    """
-    if not SKIDDLE_API_KEY or not PROVIDER_CONFIG.get("skiddle", True):
-        return []
-
+@async_ttl_cache(PROVIDER_CACHE_TTL_SECONDS, PROVIDER_ERROR_TTL_SECONDS)
+async def _skiddle_get_events() -> List[Dict]:
+    """Low-level helper to call the Skiddle events API. Raises on failure."""
     url = "https://www.skiddle.com/api/v1/events/"
     params = {
         "api_key": SKIDDLE_API_KEY,
@@ -384,122 +658,300 @@ async def fetch_skiddle_hot() -> List[Opportunity]:
         "order": "date",
     }
 
+    resp = await get_http().get(url, params=params)
+    resp.raise_for_status()
+    data = _json_loads(resp.content)
+    return data.get("results", [])
+
+
+def _skiddle_opportunity(ev: Dict) -> Opportunity:
+    """Build a scored Opportunity from a Skiddle event."""
+    name = ev.get("eventname") or "Unknown Skiddle Event"
+    town = ev.get("town") or ev.get("venue", "") or "Unknown"
+    venue_name = ev.get("venue", "") or "Unknown venue"
+    date_raw = ev.get("date") or ""
+    date_str = date_raw
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-    except Exception as e:
-        logger.warning("Skiddle request failed: %s", e)
-        return []
+        date_str = date.fromisoformat(date_raw).strftime("%d %b %Y")
+    except Exception:
+        pass
 
-    results = data.get("results", [])
-    out: List[Opportunity] = []
+    # price
+    primary_min = 0.0
+    primary_max = 0.0
+    try:
+        if ev.get("minprice"):
+            primary_min = float(ev["minprice"])
+        if ev.get("maxprice"):
+            primary_max = float(ev["maxprice"])
+    except Exception:
+        pass
 
-    for ev in results:
-        name = ev.get("eventname") or "Unknown Skiddle Event"
-        town = ev.get("town") or ev.get("venue", "") or "Unknown"
-        venue_name = ev.get("venue", "") or "Unknown venue"
-        date_raw = ev.get("date") or ""
-        date_str = date_raw
-        try:
-            dt = datetime.strptime(date_raw, "%Y-%m-%d")
-            date_str = dt.strftime("%d %b %Y")
-        except Exception:
-            pass
+    name_lc = name.lower()
+    city_lc = town.lower()
+    demand_score, risk_score, tags = _score_skiddle(name_lc, city_lc, primary_min)
+
+    return Opportunity(
+        event_id=str(ev.get("id") or name),
+        name=name,
+        city=town,
+        venue=venue_name,
+        date_str=date_str,
+        source="Skiddle",
+        primary_min=primary_min,
+        primary_max=primary_max,
+        demand_score=demand_score,
+        risk_score=risk_score,
+        url=ev.get("link"),
+        tags=tags,
+    )
 
-        # price
-        primary_min = 0.0
-        primary_max = 0.0
-        try:
-            if ev.get("minprice"):
-                primary_min = float(ev["minprice"])
-            if ev.get("maxprice"):
-                primary_max = float(ev["maxprice"])
-        except Exception:
-            pass
 
-        name_lower = name.lower()
-        demand_score = 55.0
-
-        # Boost if in one of our UK target cities
-        if any(c.lower() in town.lower() for c in UK_CITIES):
-            demand_score += 10.0
-
-        # Boost if trending artist/brand appears in eventname
-        for artist in TRENDING_ARTISTS:
-            if artist.lower() in name_lower:
-                demand_score += 25.0
-                break
-
-        # Boost for cheap entry (classic rave/flipper territory)
-        if primary_min > 0 and primary_min <= 35:
-            demand_score += 10.0
-
-        # Risk is slightly higher than TM music due to club cancellations, etc.
-        risk_score = 20.0
-
-        tags: List[str] = ["Skiddle"]
-        if "festival" in name_lower:
-            tags.append("festival")
-        if primary_min > 0 and primary_min <= 25:
-            tags.append("cheap-entry")
-        if demand_score >= 80:
-            tags.append("hype")
-
-        event_id = str(ev.get("id") or name)
-        link = ev.get("link")
-
-        opp = Opportunity(
-            event_id=event_id,
-            name=name,
-            city=town,
-            venue=venue_name,
-            date_str=date_str,
-            source="Skiddle",
-            primary_min=primary_min,
-            primary_max=primary_max,
-            demand_score=demand_score,
-            risk_score=risk_score,
-            url=link,
-            tags=tags,
-        )
-        out.append(opp)
+async def fetch_skiddle_hot(down: Dict[str, bool]) -> List[Opportunity]:
+    """
+    Fetch hot UK events from Skiddle API.
+    Focus: raves, club nights, festivals, live music in UK cities.
+    """
+    if not SKIDDLE_API_KEY or not PROVIDER_CONFIG.get("skiddle", True):
+        return []
+
+    try:
+        results = await _skiddle_get_events()
+    except Exception as e:
+        logger.warning("Skiddle request failed: %s", e)
+        down["skiddle"] = is_retryable_error(e)
+        return []
+    down["skiddle"] = False
 
-    return out
+    return await asyncio.to_thread(_build_opportunities, _skiddle_opportunity, results)
 
 
 # ======================================================
 # Radar scan
 # ======================================================
 
+_BY_TRADE_SCORE = attrgetter("trade_score")
+
+
 async def run_radar_scan() -> List[Opportunity]:
-    """Pull hot music + boxing + Skiddle events and return sorted opportunities."""
+    """
+    Pull hot music + boxing + Skiddle events and return sorted opportunities.
+    Which queried providers were down is recorded in LAST_SCAN_PROVIDERS_DOWN.
+    """
+    global LAST_SCAN_PROVIDERS_DOWN
     logger.info("Running radar scan (Ticketmaster + Skiddle)…")
+    down: Dict[str, bool] = {}
     music, boxing, skiddle = await asyncio.gather(
-        fetch_tm_music_hot(),
-        fetch_tm_boxing_hot(),
-        fetch_skiddle_hot(),
+        fetch_tm_music_hot(down),
+        fetch_tm_boxing_hot(down),
+        fetch_skiddle_hot(down),
     )
+    LAST_SCAN_PROVIDERS_DOWN = down
     all_opps = music + boxing + skiddle
-    all_opps.sort(key=lambda o: o.trade_score, reverse=True)
+    all_opps.sort(key=_BY_TRADE_SCORE, reverse=True)
     logger.info("Radar scan complete: %d opportunities.", len(all_opps))
     return all_opps
 
 
+async def get_opps_cached(max_age: float = SCAN_RESULT_MAX_AGE_SECONDS) -> List[Opportunity]:
+    """
+    Return the last scan if it is under max_age seconds old, else scan again.
+    Concurrent callers queue on one lock, so a burst of taps runs one scan.
+    """
+    global _LAST_OPPS, _LAST_OPPS_AT, _SCAN_LOCK
+    if _SCAN_LOCK is None:
+        _SCAN_LOCK = asyncio.Lock()
+    async with _SCAN_LOCK:
+        if _LAST_OPPS_AT is not None and time.monotonic() - _LAST_OPPS_AT < max_age:
+            return _LAST_OPPS
+        _LAST_OPPS = await run_radar_scan()
+        _LAST_OPPS_AT = time.monotonic()
+        return _LAST_OPPS
+
+
+def wake_radar_loop() -> None:
+    """Run the next radar tick now and drop any failure backoff (a provider was switched on)."""
+    if _RADAR_WAKE is not None:
+        _RADAR_WAKE.set()
+
+
+def invalidate_scan_cache() -> None:
+    """Force the next get_opps_cached() to rescan (e.g. after a provider toggle)."""
+    global _LAST_OPPS_AT
+    _LAST_OPPS_AT = None
+
+
+# ======================================================
+# Opportunity formatting
+# ======================================================
+
+# Shared body of alert + hot-snapshot entries; filled via format_map
+_OPP_BODY_TMPL = (
+    "{venue} – {city} – {date_str}\n"
+    "{price_line}\n"
+    "Demand: {demand:.1f} | Margin guess: {margin:.1f}% | Risk: {risk:.1f}\n"
+    "Trade score: {score:.1f}{tags_str}"
+)
+
+
+@lru_cache(maxsize=256)
+def format_opportunity_body(opp: Opportunity) -> str:
+    """
+    Venue/price/score lines shared by alerts and the hot snapshot.
+    Cached on the (frozen, hashable) Opportunity, so a shared scan result
+    re-rendered by several /scan or HUD taps is only formatted once.
+    """
+    tags_str = ""
+    if opp.tags:
+        tags_str = " | " + ", ".join(opp.tags)
+
+    price_line = "Price: unknown"
+    if opp.primary_min > 0 and opp.primary_max > 0:
+        price_line = f"Price: £{opp.primary_min:.0f}–£{opp.primary_max:.0f}"
+    elif opp.primary_min > 0:
+        price_line = f"From: £{opp.primary_min:.0f}"
+
+    return _OPP_BODY_TMPL.format_map({
+        "venue": opp.venue,
+        "city": opp.city,
+        "date_str": opp.date_str,
+        "price_line": price_line,
+        "demand": opp.demand_score,
+        "margin": opp.margin_pct_guess,
+        "risk": opp.risk_score,
+        "score": opp.trade_score,
+        "tags_str": tags_str,
+    })
+
+
+def split_message(text: str, limit: int = TG_MESSAGE_LIMIT) -> List[str]:
+    """Split text on blank lines (entry boundaries) into chunks of at most limit chars."""
+    if len(text) <= limit:
+        return [text]
+
+    chunks: List[str] = []
+    current = ""
+    for block in text.split("\n\n"):
+        # A single entry over the limit gets hard-cut
+        while len(block) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(block[:limit])
+            block = block[limit:]
+        candidate = f"{current}\n\n{block}" if current else block
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = block
+        else:
+            current = candidate
+    chunks.append(current)
+    # Telegram rejects empty/whitespace-only messages
+    return [c for c in chunks if c.strip()]
+
+
+async def send_chunked(first: Callable, rest: Callable, text: str, **kwargs) -> None:
+    """
+    Send text as first(chunk) plus rest(chunk) for any overflow, e.g. edit
+    the progress message then post follow-ups. kwargs go to every call.
+    """
+    chunks = split_message(text)
+    await first(chunks[0], **kwargs)
+    for chunk in chunks[1:]:
+        await rest(chunk, **kwargs)
+
+
+def build_alert_text(opp: Opportunity) -> str:
+    lines = [
+        f"🚨 Money-maker radar hit ({opp.source})",
+        "",
+        opp.name,
+        format_opportunity_body(opp),
+    ]
+    if opp.url:
+        lines.append("")
+        lines.append(f"Listing: {opp.url}")
+
+    return "\n".join(lines)
+
+
 # ======================================================
 # Background radar loop (NO JobQueue)
 # ======================================================
 
+async def broadcast_alert(app, text: str, user_ids: Iterable[int]) -> None:
+    """
+    Send one alert message to every user, ALERT_SEND_CONCURRENCY at a time.
+    user_ids is consumed before the first await, so a live set is safe here.
+    Alerts over TG_MESSAGE_LIMIT go out as several messages, in order.
+    """
+    sem = asyncio.Semaphore(ALERT_SEND_CONCURRENCY)
+    chunks = split_message(text)
+
+    async def send(user_id: int) -> None:
+        async with sem:
+            try:
+                for chunk in chunks:
+                    await app.bot.send_message(
+                        chat_id=user_id,
+                        text=chunk,
+                        disable_web_page_preview=False,
+                    )
+            except Exception as e:
+                logger.warning("Failed to send alert to %s: %s", user_id, e)
+
+    await asyncio.gather(*(send(uid) for uid in user_ids))
+
+
+async def alert_dispatcher(app) -> None:
+    """Broadcast queued alerts so slow Telegram sends never hold up a scan."""
+    while True:
+        text = await _ALERT_QUEUE.get()
+        try:
+            await broadcast_alert(app, text, KNOWN_USERS)
+        except Exception as e:
+            logger.exception("Error broadcasting alert: %s", e)
+        finally:
+            _ALERT_QUEUE.task_done()
+
+
+def next_radar_interval(consecutive_failures: int) -> float:
+    """Base interval doubled per failed tick (capped), with jitter."""
+    interval = min(
+        RADAR_INTERVAL_SECONDS * (2 ** min(consecutive_failures, 8)),
+        RADAR_INTERVAL_MAX_SECONDS,
+    )
+    return interval * random.uniform(1 - RADAR_INTERVAL_JITTER, 1 + RADAR_INTERVAL_JITTER)
+
+
+def prune_alerted_events(now: float) -> None:
+    """Forget alerted events past their TTL, and the oldest beyond ALERTED_EVENT_MAX."""
+    # Oldest alerts sit at the front of the dict, so stop at the first keeper
+    while ALERTED_EVENT_IDS:
+        event_id, alerted_at = next(iter(ALERTED_EVENT_IDS.items()))
+        expired = now - alerted_at >= ALERTED_EVENT_TTL_SECONDS
+        if not expired and len(ALERTED_EVENT_IDS) <= ALERTED_EVENT_MAX:
+            break
+        del ALERTED_EVENT_IDS[event_id]
+
+
 async def radar_auto_loop(app):
     """
-    Background task that runs forever, every RADAR_INTERVAL_SECONDS.
-    Uses app.bot.send_message directly (no JobQueue).
+    Background task that scans about every RADAR_INTERVAL_SECONDS (jittered,
+    backed off while every provider is down) – no JobQueue. New hot events
+    are rendered into one alert and put on _ALERT_QUEUE; alert_dispatcher
+    does the sending.
     """
-    global LAST_SCAN_TIME, LAST_SCAN_COUNT, ALERTED_EVENT_IDS, RADAR_LOOP_STARTED
+    global LAST_SCAN_TIME, LAST_SCAN_COUNT, ALERTED_EVENT_IDS, RADAR_LOOP_STARTED, _RADAR_WAKE
     RADAR_LOOP_STARTED = True
+    _RADAR_WAKE = asyncio.Event()
     logger.info("Radar auto-loop started (interval=%ds).", RADAR_INTERVAL_SECONDS)
 
+    # Ticks in a row where every queried provider was down. One healthy
+    # provider keeps the normal interval, and config errors (401/403) or
+    # an empty scan (providers off/unconfigured) never back off.
+    consecutive_failures = 0
+
     while True:
         try:
             if not KNOWN_USERS:
@@ -508,25 +960,35 @@ async def radar_auto_loop(app):
                 continue
 
             logger.info("Auto radar scan tick – scanning Ticketmaster + Skiddle…")
-            opps = await run_radar_scan()
+            # Always a fresh scan, but /scan and the HUD can reuse it
+            opps = await get_opps_cached(max_age=0)
             LAST_SCAN_TIME = datetime.now(timezone.utc)
             LAST_SCAN_COUNT = len(opps)
-
-            # Filter to “money maker” grade
-            hot_opps = [o for o in opps if o.trade_score >= MONEY_MAKER_THRESHOLD]
-
-            # Avoid re-alerting the same events in this process lifetime
-            new_hot = [o for o in hot_opps if o.event_id not in ALERTED_EVENT_IDS]
+            down = LAST_SCAN_PROVIDERS_DOWN
+            all_down = bool(down) and all(down.values())
+            consecutive_failures = consecutive_failures + 1 if all_down else 0
+
+            now = time.monotonic()
+            prune_alerted_events(now)
+
+            # One pass over the sorted scan: stop below the “money maker”
+            # threshold, skip events already alerted within
+            # ALERTED_EVENT_TTL_SECONDS, and cap alerts per scan
+            new_hot: List[Opportunity] = []
+            for o in opps:
+                if o.trade_score < MONEY_MAKER_THRESHOLD:
+                    break
+                if o.event_id in ALERTED_EVENT_IDS:
+                    continue
+                new_hot.append(o)
+                if len(new_hot) == MAX_ALERTS_PER_SCAN:
+                    break
 
             if not new_hot:
                 logger.info("No NEW hot events above threshold this round.")
             else:
-                # Cap alerts per scan
-                new_hot = new_hot[:5]
-
                 # Record them as alerted
-                for o in new_hot:
-                    ALERTED_EVENT_IDS.add(o.event_id)
+                ALERTED_EVENT_IDS.update((o.event_id, now) for o in new_hot)
 
                 logger.info(
                     "Pushing %d new hot events to %d users.",
@@ -534,75 +996,71 @@ async def radar_auto_loop(app):
                     len(KNOWN_USERS),
                 )
 
-                # Push alerts to all known users
-                for user_id in list(KNOWN_USERS):
-                    for opp in new_hot:
-                        tags_str = ""
-                        if opp.tags:
-                            tags_str = " | " + ", ".join(opp.tags)
-
-                        price_line = "Price: unknown"
-                        if opp.primary_min > 0 and opp.primary_max > 0:
-                            price_line = (
-                                f"Price: £{opp.primary_min:.0f}–£{opp.primary_max:.0f}"
-                            )
-                        elif opp.primary_min > 0:
-                            price_line = f"From: £{opp.primary_min:.0f}"
-
-                        lines = [
-                            f"🚨 Money-maker radar hit ({opp.source})",
-                            "",
-                            f"{opp.name}",
-                            f"{opp.venue} – {opp.city} – {opp.date_str}",
-                            price_line,
-                            (
-                                f"Demand: {opp.demand_score:.1f} | "
-                                f"Margin guess: {opp.margin_pct_guess:.1f}% | "
-                                f"Risk: {opp.risk_score:.1f}"
-                            ),
-                            f"Trade score: {opp.trade_score:.1f}{tags_str}",
-                        ]
-                        if opp.url:
-                            lines.append("")
-                            lines.append(f"Listing: {opp.url}")
-
-                        text = "\n".join(lines)
-
-                        try:
-                            await app.bot.send_message(
-                                chat_id=user_id,
-                                text=text,
-                                disable_web_page_preview=False,
-                            )
-                        except Exception as e:
-                            logger.warning(
-                                "Failed to send alert to %s: %s", user_id, e
-                            )
+                # One combined message per user; alert_dispatcher does the sending
+                text = "\n\n—\n\n".join(build_alert_text(o) for o in new_hot)
+                await _ALERT_QUEUE.put(text)
 
         except Exception as e:
             logger.exception("Error in radar_auto_loop: %s", e)
+            consecutive_failures += 1
+
+        interval = next_radar_interval(consecutive_failures)
+        if consecutive_failures:
+            logger.info(
+                "Radar backing off after %d failed scans; next in %ds.",
+                consecutive_failures,
+                interval,
+            )
+        try:
+            await asyncio.wait_for(_RADAR_WAKE.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            # Woken early: config changed, so the old failure streak doesn't apply
+            _RADAR_WAKE.clear()
+            consecutive_failures = 0
+
 
-        await asyncio.sleep(RADAR_INTERVAL_SECONDS)
+async def on_shutdown(app):
+    """Called on Application shutdown; release pooled HTTP connections."""
+    await close_http()
+
+
+async def notify_admin_started(app) -> None:
+    """Tell ADMIN_CHAT_ID the bot is up; failures are only logged."""
+    try:
+        text = (
+            "SpectraSeat radar bot started.\n\n"
+            f"Providers:\n"
+            f"- Ticketmaster: {'ON' if TM_API_KEY else 'OFF'}\n"
+            f"- Skiddle: {'ON' if SKIDDLE_API_KEY else 'OFF'}\n\n"
+            f"Auto radar every {RADAR_INTERVAL_SECONDS // 60} min, "
+            f"threshold trade_score ≥ {MONEY_MAKER_THRESHOLD:.0f}."
+        )
+        await app.bot.send_message(chat_id=int(ADMIN_CHAT_ID), text=text)
+    except Exception as e:
+        logger.warning("Failed to send startup notify to ADMIN_CHAT_ID: %s", e)
 
 
 async def on_startup(app):
     """Called once the Application is ready; start the radar loop + optional admin notify."""
-    logger.info("on_startup() called – creating radar_auto_loop task.")
+    if STATE_DB_PATH:
+        try:
+            KNOWN_USERS.update(await asyncio.to_thread(load_known_users))
+            logger.info("Loaded %d known users from state DB.", len(KNOWN_USERS))
+        except Exception as e:
+            logger.warning("Failed to load known users from STATE_DB_PATH: %s", e)
+
+    global _ALERT_QUEUE
+    _ALERT_QUEUE = asyncio.Queue(maxsize=ALERT_QUEUE_MAX)
+
+    logger.info("on_startup() called – creating radar_auto_loop + alert_dispatcher tasks.")
+    app.create_task(alert_dispatcher(app))
     app.create_task(radar_auto_loop(app))
 
     if ADMIN_CHAT_ID:
-        try:
-            text = (
-                "SpectraSeat radar bot started.\n\n"
-                f"Providers:\n"
-                f"- Ticketmaster: {'ON' if TM_API_KEY else 'OFF'}\n"
-                f"- Skiddle: {'ON' if SKIDDLE_API_KEY else 'OFF'}\n\n"
-                f"Auto radar every {RADAR_INTERVAL_SECONDS // 60} min, "
-                f"threshold trade_score ≥ {MONEY_MAKER_THRESHOLD:.0f}."
-            )
-            await app.bot.send_message(chat_id=int(ADMIN_CHAT_ID), text=text)
-        except Exception as e:
-            logger.warning("Failed to send startup notify to ADMIN_CHAT_ID: %s", e)
+        # Fire-and-forget so a slow send doesn't hold up startup
+        app.create_task(notify_admin_started(app))
 
 
 # ======================================================
@@ -635,7 +1093,24 @@ def build_providers_status_lines() -> List[str]:
     ]
 
 
+def _hud_main_state() -> Tuple:
+    """Everything build_hud_main_text() depends on."""
+    return (
+        LAST_SCAN_TIME,
+        LAST_SCAN_COUNT,
+        RADAR_LOOP_STARTED,
+        tuple(PROVIDER_CONFIG.values()),
+        len(KNOWN_USERS),
+        len(ALERTED_EVENT_IDS),
+    )
+
+
 def build_hud_main_text() -> str:
+    global _LAST_HUD_STATE, _LAST_HUD_TEXT
+    state = _hud_main_state()
+    if state == _LAST_HUD_STATE:
+        return _LAST_HUD_TEXT
+
     if LAST_SCAN_TIME is None:
         last_scan_line = "Last scan: not run yet"
     else:
@@ -668,14 +1143,16 @@ def build_hud_main_text() -> str:
         "",
         "👤 Users",
         f"- Known users: {len(KNOWN_USERS)}",
-        f"- Unique hot events alerted (this run): {len(ALERTED_EVENT_IDS)}",
+        f"- Hot events alerted (last 7 days): {len(ALERTED_EVENT_IDS)}",
         "",
         "🎛 Providers",
         *providers_lines,
         "",
         "Use the buttons below to refresh, see hot events, or trigger a scan.",
     ]
-    return "\n".join(lines)
+    _LAST_HUD_TEXT = "\n".join(lines)
+    _LAST_HUD_STATE = state
+    return _LAST_HUD_TEXT
 
 
 def build_hud_providers_text() -> str:
@@ -691,36 +1168,23 @@ def build_hud_providers_text() -> str:
     return "\n".join(lines)
 
 
+def _format_hot_entry(opp: Opportunity) -> str:
+    entry = f"{opp.name} ({opp.source})\n{format_opportunity_body(opp)}"
+    if opp.url:
+        entry += f"\n{opp.url}"
+    return entry
+
+
 def build_hud_hot_text(opps: List[Opportunity]) -> str:
     if not opps:
         return "🔥 Hot Events\n\nNo opportunities found right now. Try /scan later."
 
-    top = opps[:7]
-    lines = ["🔥 Hot Events Snapshot", ""]
-    for opp in top:
-        tags_str = ""
-        if opp.tags:
-            tags_str = " | " + ", ".join(opp.tags)
-
-        price_line = "Price: unknown"
-        if opp.primary_min > 0 and opp.primary_max > 0:
-            price_line = f"Price: £{opp.primary_min:.0f}–£{opp.primary_max:.0f}"
-        elif opp.primary_min > 0:
-            price_line = f"From: £{opp.primary_min:.0f}"
-
-        lines.append(
-            f"{opp.name} ({opp.source})\n"
-            f"{opp.venue} – {opp.city} – {opp.date_str}\n"
-            f"{price_line}\n"
-            f"Demand: {opp.demand_score:.1f} | Margin guess: {opp.margin_pct_guess:.1f}% | "
-            f"Risk: {opp.risk_score:.1f}\n"
-            f"Trade score: {opp.trade_score:.1f}{tags_str}\n"
-            f"{opp.url or ''}\n"
-        )
-    return "\n".join(lines)
+    return "🔥 Hot Events Snapshot\n\n" + "\n\n".join(_format_hot_entry(o) for o in opps[:7])
 
 
+@lru_cache(maxsize=1)
 def build_hud_main_keyboard() -> InlineKeyboardMarkup:
+    """Static main HUD buttons; built once and reused (PTB markups are immutable)."""
     return InlineKeyboardMarkup(
         [
             [
@@ -773,37 +1237,54 @@ def build_hud_providers_keyboard() -> InlineKeyboardMarkup:
 # Commands
 # ======================================================
 
+_START_TEXT = (
+    "✅ SpectraSeat radar online.\n\n"
+    "I automatically scan UK Ticketmaster (music + boxing) and Skiddle for "
+    "hot events – festivals, arena shows, boxing cards, raves.\n\n"
+    "Every few minutes I:\n"
+    "- Pull fresh UK events (Ticketmaster + Skiddle)\n"
+    "- Score them for demand / margin / risk\n"
+    "- DM you when something crosses the money-maker threshold.\n\n"
+    "Commands:\n"
+    "- /hud – full radar HUD (dashboard + buttons)\n"
+    "- /status – quick status of last scan\n"
+    "- /scan – force a manual radar scan now\n"
+    "- /ping – simple health check\n"
+    "- /ukhot – shortcut to /scan\n"
+)
+_PING_TEXT = "🏓 Pong – radar is alive."
+
+
+def track_user(handler):
+    """Register the calling user in KNOWN_USERS (alert subscribers) before the handler runs."""
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        user = update.effective_user
+        if user is not None and user.id not in KNOWN_USERS:
+            KNOWN_USERS.add(user.id)
+            try:
+                await asyncio.to_thread(save_known_user, user.id)
+            except Exception as e:
+                logger.warning("Failed to persist user %s: %s", user.id, e)
+        return await handler(update, context)
+
+    return wrapper
+
+
+@track_user
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    KNOWN_USERS.add(user_id)
     logger.info("User %s called /start. KNOWN_USERS=%d", user_id, len(KNOWN_USERS))
 
-    text = (
-        "✅ SpectraSeat radar online.\n\n"
-        "I automatically scan UK Ticketmaster (music + boxing) and Skiddle for "
-        "hot events – festivals, arena shows, boxing cards, raves.\n\n"
-        "Every few minutes I:\n"
-        "- Pull fresh UK events (Ticketmaster + Skiddle)\n"
-        "- Score them for demand / margin / risk\n"
-        "- DM you when something crosses the money-maker threshold.\n\n"
-        "Commands:\n"
-        "- /hud – full radar HUD (dashboard + buttons)\n"
-        "- /status – quick status of last scan\n"
-        "- /scan – force a manual radar scan now\n"
-        "- /ping – simple health check\n"
-        "- /ukhot – shortcut to /scan\n"
-    )
-    await update.message.reply_text(text)
+    await update.message.reply_text(_START_TEXT)
 
 
 async def cmd_ping(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text("🏓 Pong – radar is alive.")
+    await update.message.reply_text(_PING_TEXT)
 
 
+@track_user
 async def cmd_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    KNOWN_USERS.add(user_id)
-
     if LAST_SCAN_TIME is None:
         await update.message.reply_text(
             "I haven’t completed a radar scan yet. Use /scan to trigger one."
@@ -814,21 +1295,22 @@ async def cmd_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = (
         f"📊 Last radar scan: {when}\n"
         f"Events evaluated: {LAST_SCAN_COUNT}\n"
-        f"Alerted events this session: {len(ALERTED_EVENT_IDS)}\n"
+        f"Alerted events (last 7 days): {len(ALERTED_EVENT_IDS)}\n"
         f"Known users: {len(KNOWN_USERS)}"
     )
     await update.message.reply_text(msg)
 
 
+@track_user
 async def cmd_scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manual radar scan for when you want an instant snapshot."""
-    user_id = update.effective_user.id
-    KNOWN_USERS.add(user_id)
-    logger.info("User %s requested manual /scan", user_id)
+    logger.info("User %s requested manual /scan", update.effective_user.id)
 
-    msg = await update.message.reply_text("📡 Running radar scan now…")
-
-    opps = await run_radar_scan()
+    # Send the progress note and start scanning at the same time
+    msg, opps = await asyncio.gather(
+        update.message.reply_text("📡 Running radar scan now…"),
+        get_opps_cached(),
+    )
     if not opps:
         await msg.edit_text(
             "I couldn’t pull any events just now.\n\n"
@@ -838,14 +1320,17 @@ async def cmd_scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     text = build_hud_hot_text(opps)
-    await msg.edit_text(text, disable_web_page_preview=False)
+    await send_chunked(
+        msg.edit_text,
+        update.effective_chat.send_message,
+        text,
+        disable_web_page_preview=False,
+    )
 
 
+@track_user
 async def cmd_hud(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send the main HUD dashboard with buttons."""
-    user_id = update.effective_user.id
-    KNOWN_USERS.add(user_id)
-
     text = build_hud_main_text()
     keyboard = build_hud_main_keyboard()
     await update.message.reply_text(
@@ -859,16 +1344,52 @@ async def cmd_hud(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # HUD callback handler
 # ======================================================
 
+def _is_repeat_press(chat_id: int, data: str) -> bool:
+    """True if this chat pressed the same button within HUD_CALLBACK_DEBOUNCE_SECONDS."""
+    now = time.monotonic()
+    key = (chat_id, data)
+    last = _LAST_CALLBACK_AT.get(key)
+    if last is not None and now - last < HUD_CALLBACK_DEBOUNCE_SECONDS:
+        return True
+    if len(_LAST_CALLBACK_AT) >= 1000:
+        # Only recent presses matter; drop the rest
+        for k, t in list(_LAST_CALLBACK_AT.items()):
+            if now - t >= HUD_CALLBACK_DEBOUNCE_SECONDS:
+                del _LAST_CALLBACK_AT[k]
+    _LAST_CALLBACK_AT[key] = now
+    return False
+
+
+async def _edit_hud_message(query, text: str, **kwargs) -> None:
+    """
+    Edit the HUD message in place, skipping edits that wouldn't change it.
+    Telegram rejects identical edits with "Message is not modified".
+    """
+    if query.message is not None and query.message.text == text:
+        return
+    try:
+        await query.edit_message_text(text, **kwargs)
+    except BadRequest as e:
+        # Same text after Telegram's own normalisation
+        if "not modified" not in str(e).lower():
+            raise
+
+
 async def hud_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     data = query.data
 
+    if query.message is not None and _is_repeat_press(query.message.chat_id, data):
+        await query.answer("Please wait…")
+        return
+    await query.answer()
+
     if data in ("hud_main", "hud_refresh"):
         text = build_hud_main_text()
         keyboard = build_hud_main_keyboard()
-        await query.edit_message_text(
-            text=text,
+        await _edit_hud_message(
+            query,
+            text,
             disable_web_page_preview=True,
             reply_markup=keyboard,
         )
@@ -885,37 +1406,48 @@ async def hud_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     if data == "hud_hot":
-        opps = await run_radar_scan()
+        opps = await get_opps_cached()
         text = build_hud_hot_text(opps)
         keyboard = build_hud_main_keyboard()
-        await query.edit_message_text(
-            text=text,
+        await send_chunked(
+            partial(_edit_hud_message, query, reply_markup=keyboard),
+            update.effective_chat.send_message,
+            text,
             disable_web_page_preview=False,
-            reply_markup=keyboard,
         )
         return
 
     if data == "hud_scan":
-        opps = await run_radar_scan()
+        # "Force Scan" means fresh – don't serve the shared recent result
+        opps = await get_opps_cached(max_age=0)
         text = "📡 Manual radar scan triggered from HUD.\n\n"
         text += build_hud_hot_text(opps)
         keyboard = build_hud_main_keyboard()
-        await query.edit_message_text(
-            text=text,
+        await send_chunked(
+            partial(_edit_hud_message, query, reply_markup=keyboard),
+            update.effective_chat.send_message,
+            text,
             disable_web_page_preview=False,
-            reply_markup=keyboard,
         )
         return
 
     # Toggles
+    enabled = False
     if data == "hud_toggle_tm_music":
-        PROVIDER_CONFIG["tm_music"] = not PROVIDER_CONFIG.get("tm_music", True)
+        enabled = PROVIDER_CONFIG["tm_music"] = not PROVIDER_CONFIG.get("tm_music", True)
     elif data == "hud_toggle_tm_boxing":
-        PROVIDER_CONFIG["tm_boxing"] = not PROVIDER_CONFIG.get("tm_boxing", True)
+        enabled = PROVIDER_CONFIG["tm_boxing"] = not PROVIDER_CONFIG.get("tm_boxing", True)
     elif data == "hud_toggle_skiddle":
-        PROVIDER_CONFIG["skiddle"] = not PROVIDER_CONFIG.get("skiddle", True)
+        enabled = PROVIDER_CONFIG["skiddle"] = not PROVIDER_CONFIG.get("skiddle", True)
 
     if data.startswith("hud_toggle_"):
+        # The cached scan may include/exclude the toggled provider
+        invalidate_scan_cache()
+        # Only a newly enabled provider deserves an immediate, un-backed-off
+        # tick; switching one off must not cancel a backoff
+        if enabled:
+            wake_radar_loop()
+
         # After toggle, re-show providers panel
         text = build_hud_providers_text()
         keyboard = build_hud_providers_keyboard()
@@ -928,32 +1460,64 @@ async def hud_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 # ======================================================
-# Main (POLLING, NO WEBHOOK, NO JOBQUEUE)
+# Main (POLLING or WEBHOOK, NO JOBQUEUE)
 # ======================================================
 
+# Every HUD button's callback_data starts with this
+HUD_CALLBACK_RE = re.compile(r"^hud_")
+
+# (command names, handler); aliases share one CommandHandler
+COMMANDS = (
+    (("start",), cmd_start),
+    (("ping",), cmd_ping),
+    (("status",), cmd_status),
+    (("scan", "ukhot"), cmd_scan),
+    (("hud",), cmd_hud),
+)
+
+
 def main() -> None:
     logger.info("Starting SpectraSeat autonomous UK radar bot (Ticketmaster + Skiddle)…")
 
     application = (
         ApplicationBuilder()
         .token(BOT_TOKEN)
+        # Global + per-chat flood limits, with retry on RetryAfter
+        .rate_limiter(AIORateLimiter(max_retries=3))
         .post_init(on_startup)  # start radar loop after bot connects
+        .post_shutdown(on_shutdown)
         .build()
     )
 
-    # Commands
-    application.add_handler(CommandHandler("start", cmd_start))
-    application.add_handler(CommandHandler("ping", cmd_ping))
-    application.add_handler(CommandHandler("status", cmd_status))
-    application.add_handler(CommandHandler("scan", cmd_scan))
-    application.add_handler(CommandHandler("ukhot", cmd_scan))
-    application.add_handler(CommandHandler("hud", cmd_hud))
+    # Commands, then the HUD callback, as one handler group
+    application.add_handlers(
+        [CommandHandler(names, callback) for names, callback in COMMANDS]
+        + [CallbackQueryHandler(hud_callback, pattern=HUD_CALLBACK_RE)]
+    )
 
-    # HUD callback
-    application.add_handler(CallbackQueryHandler(hud_callback, pattern=r"^hud_"))
+    if USE_WEBHOOK:
+        if not PUBLIC_URL:
+            raise RuntimeError("USE_WEBHOOK is set but PUBLIC_URL / RENDER_EXTERNAL_URL is not.")
+        if not TG_WEBHOOK_SECRET:
+            # Without it anyone can POST forged updates to the public endpoint
+            raise RuntimeError("USE_WEBHOOK is set but TG_WEBHOOK_SECRET is not.")
+        logger.info("Starting webhook on port %d…", PORT)
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=PORT,
+            url_path="telegram",
+            webhook_url=f"{PUBLIC_URL.rstrip('/')}/telegram",
+            secret_token=TG_WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        return
 
     logger.info("Starting polling…")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Long polling: Telegram holds each idle getUpdates open for 30s
+    application.run_polling(
+        allowed_updates=Update.ALL_TYPES,
+        timeout=TG_POLL_TIMEOUT_SECONDS,
+    )
 
 
 if __name__ == "__main__":